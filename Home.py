@@ -1,167 +1,112 @@
 # Home.py (or app.py if this is the main page)
+import html
 import streamlit as st
 from pathlib import Path
-import base64
 
 # Auth helpers
-from auth import complete_login_if_returned, login_url
+from auth import clear_query_params, complete_login_if_returned, get_query_params, is_logged_in, login_url
+# Asset helpers (shared module: imported once per process, not re-run on every rerun)
+from utils.assets import derived_url, is_present, load_text, picture_html, prefetch_derivatives, thumbnail_srcs, versioned_static_url
 
 # --- Page config ---
 st.set_page_config(page_title="PPE Safety Suite", page_icon="🦺", layout="wide")
 
-# ✅ Finish OAuth callback if we just returned from Cognito (non-blocking)
-complete_login_if_returned()
+# Read the query params once per run and reuse the dict below (auth picks the query-param API).
+qp = get_query_params()
 
-def _get_qp():
-    try:
-        return dict(st.query_params)
-    except Exception:
-        return st.experimental_get_query_params()
+# ✅ Finish OAuth callback if we just returned from Cognito (non-blocking)
+if "code" in qp:
+    complete_login_if_returned(qp)
 
-qp = _get_qp()
+# The sentinel stops a stale ?logout (URL not flushed yet) from triggering a second clear + rerun.
 logout_clicked = ("logout" in qp)
-if logout_clicked:
+if logout_clicked and not st.session_state.get("_logged_out"):
+    had_session = bool(st.session_state)
     st.session_state.clear()
-    try:
-        st.query_params.clear()
-    except Exception:
-        st.experimental_set_query_params()
-    st.rerun()
-
-# ✅ Hide sidebar when logged out
-if "id_token" not in st.session_state:
-    st.markdown(
-        """
-        <style>
-        [data-testid="stSidebar"] { display: none !important; }
-        .block-container { padding-left: 2rem; padding-right: 2rem; }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-
-# Greeting
-if "user" in st.session_state:
-    user_email = st.session_state["user"].get("email", "")
-    user_name  = st.session_state["user"].get("name", "")
-    display_name = (user_email.split("@")[0] if user_email else "") or (user_name or "User")
-else:
-    display_name = None
+    st.session_state["_logged_out"] = True
+    clear_query_params()
+    if had_session:  # nothing was cleared on an empty session, so this run can render as-is
+        st.rerun()
+elif not logout_clicked:
+    st.session_state.pop("_logged_out", None)
 
 # --- Assets ---
-HERO_IMG   = Path("images/home1.png")
 CARD_IMG1  = Path("images/home1.png")
 CARD_IMG2  = Path("images/home2.png")
 CARD_IMG3  = Path("images/home3.png")
 
+# Slideshow images are served by Streamlit's static file server (see .streamlit/config.toml)
 SLIDESHOW_IMAGES = [
-    Path("images/carousel1.png"),
-    Path("images/carousel2.png"),
-    Path("images/carousel3.png"),
+    Path("static/carousel1.png"),
+    Path("static/carousel2.png"),
+    Path("static/carousel3.png"),
 ]
 HERO_HEIGHT_PX = 420
+CARD_THUMB_SIZE = (600, 500)  # cards render at max-height 250px; no need to ship full-res PNGs
 
-# --- Helpers ---
-def img_to_data_uri(p: Path) -> str:
-    data = p.read_bytes()
-    b64 = base64.b64encode(data).decode("utf-8")
-    ext = p.suffix.replace(".", "").lower()
-    mime = "jpeg" if ext in ("jpg", "jpeg") else "png"
-    return f"data:image/{mime};base64,{b64}"
+# Resolve every asset once up front; the render path below only does dict lookups.
+_ALL_ASSETS = [CARD_IMG1, CARD_IMG2, CARD_IMG3]
+prefetch_derivatives(
+    tuple((p, fmt, CARD_THUMB_SIZE) for p in _ALL_ASSETS for fmt in ("JPEG", "WEBP"))
+    + tuple((p, "WEBP", None) for p in SLIDESHOW_IMAGES)
+)
+_CARD_SRCS = {str(p): thumbnail_srcs(p, CARD_THUMB_SIZE) for p in _ALL_ASSETS if is_present(p)}
+_SLIDESHOW_SRCS = tuple((versioned_static_url(p), derived_url(p, "WEBP")) for p in SLIDESHOW_IMAGES if is_present(p))
 
 # --- Global styles (smaller card images & tight spacing) ---
-st.markdown(f"""
-<style>
-/* App background with PPE-themed warm gradient + subtle radial glow */
-.stApp {{
-  background:
-    radial-gradient(
-      circle at 15% 20%,
-      rgba(255, 127, 39, 0.08) 0%,
-      transparent 40%
-    ),
-    linear-gradient(
-      135deg,
-      #fff7ed 0%,   /* light PPE orange */
-      #ffedd5 40%,  /* soft peach */
-      #ffffff 100%  /* fade to white for readability */
-    );
-}}
-footer {{ visibility: hidden; }}
-
-/* Sidebar background to match theme */
-[data-testid="stSidebar"] {{
-  background: linear-gradient(180deg, #fff7ed 0%, #ffffff 100%);
-}}
-
-.greet {{ font-size: 16px; color: #0f172a; margin: 4px 0 8px 2px; }}
-
-.navbar {{ display: flex; justify-content: space-between; align-items: center; padding: 14px 10px; margin-bottom: 6px; width: 100%; }}
-.nav-left, .nav-right {{ display: flex; align-items: center; gap: 22px; white-space: nowrap; }}
-.nav-link {{ font-weight: 600; color: #0f172a; text-decoration: none; padding: 6px 8px; border-radius: 6px; }}
-.nav-link:hover {{ background: #f1f5f9; }}
-
-.chips {{display:flex; gap:14px; flex-wrap:wrap; margin:10px 0 6px 0;}}
-.chip {{display:inline-flex; gap:8px; align-items:center; padding:6px 10px; border:1px solid #e5e7eb; border-radius:999px; font-size:13px; background:white;}}
-.hero {{padding: 10px 0 20px 0;}}
-.kicker {{letter-spacing:.06em; text-transform:uppercase; font-size:12px; color:#2563eb; font-weight:700;}}
-.h1 {{font-size:36px; line-height:1.2; font-weight:800; color:#0f172a; margin:6px 0;}}
-.hero-subgrid {{display:grid; grid-template-columns:1fr 1fr; gap:24px; margin:14px 0 22px 0; font-size:14px; color:#334155;}}
-
-.section-kicker {{display:flex; align-items:center; gap:10px; color:#2563eb; font-weight:700; font-size:12px; text-transform:uppercase; margin-top:20px;}}
-
-.card {{display:grid; grid-template-columns:1.1fr .9fr; gap:26px; padding:22px; border:1px solid #e5e7eb; border-radius:16px; background:white;}}
-.card + .card {{margin-top:16px;}}
-.card-date {{font-size:11px; color:#64748b; text-transform:uppercase; margin-bottom:6px;}}
-.card-title {{font-size:18px; font-weight:800; margin:0 0 6px 0; color:#0f172a;}}
-.card-text {{font-size:13px; color:#334155; line-height:1.65;}}
-.card-cta {{margin-top:12px;}}
-
-.card-img-sm img {{
-  width: 100%;
-  max-height: 250px;     /* compact, consistent */
-  object-fit: cover;
-  border-radius: 12px;
-  display: block;
-  margin-top: 6px;
-}}
+HOME_CSS = Path("static/home.css")
+# The stylesheet itself is static; only the hero height is injected as a CSS custom property.
+_STYLE_HTML = (
+    f"<style>:root {{ --hero-h: {HERO_HEIGHT_PX}px; }}\n"
+    f"{load_text(HOME_CSS)}</style>"
+)
 
-.full-bleed {{width: 100vw; position: relative; left: 50%; right: 50%; margin-left: -50vw; margin-right: -50vw;}}
-.hero-bleed {{
-  width: 100vw; height: {HERO_HEIGHT_PX}px; position: relative; overflow: hidden;
-  border-radius: 12px; box-shadow: 0 6px 18px rgba(0,0,0,.12); background: #000;
-}}
-.hero-bleed img.fade {{position: absolute; inset: 0; width: 100%; height: 100%; object-fit: cover; opacity: 0; animation: fadeShow 9s infinite;}}
-.hero-bleed img.fade.img2 {{ animation-delay: 3s; }}
-.hero-bleed img.fade.img3 {{ animation-delay: 6s; }}
-@keyframes fadeShow {{ 0%{{opacity:0}} 3%{{opacity:1}} 28%{{opacity:1}} 33%{{opacity:0}} 100%{{opacity:0}} }}
+# ✅ Hide sidebar when logged out
+_HIDE_SIDEBAR_HTML = """
+<style>
+[data-testid="stSidebar"] { display: none !important; }
+.block-container { padding-left: 2rem; padding-right: 2rem; }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # --- NAVBAR ---
-nav_html = """
+_NAV_TEMPLATE = """
 <div class="navbar">
   <div class="nav-left">
     <span style="font-weight:800;">🦺 PPE Safety Suite</span>
   </div>
   <div class="nav-right">
-"""
-if "id_token" in st.session_state:
-    nav_html += """<a class="nav-link" href="?logout">Log out</a>"""
+{link}</div></div>"""
+_NAV_LOGGED_IN = _NAV_TEMPLATE.format(link='<a class="nav-link" href="?logout">Log out</a>')
+
+@st.cache_data(show_spinner=False)
+def _nav_logged_out_html() -> str:
+    # login_url() is a process-wide constant, so the logged-out navbar is too
+    return _NAV_TEMPLATE.format(link=f'<a class="nav-link" href="{login_url()}">Log in</a>')
+
+# Styles, navbar and greeting go out together as one markdown element.
+_logged_in = is_logged_in()
+_header = [_STYLE_HTML]
+if _logged_in:
+    _header.append(_NAV_LOGGED_IN)
 else:
-    nav_html += f"""<a class="nav-link" href="{login_url()}">Log in</a>"""
-nav_html += "</div></div>"
-st.markdown(nav_html, unsafe_allow_html=True)
+    _header.append(_HIDE_SIDEBAR_HTML)
+    _header.append(_nav_logged_out_html())
 
-# Greeting
-if display_name:
-    st.markdown(
-        f'<div class="greet">Welcome back to PPE Safety Suite, <strong>{display_name}</strong>.</div>',
-        unsafe_allow_html=True,
-    )
+# Greeting (rendered once per user; reruns reuse the cached HTML). Bounded, since there's an entry per user.
+@st.cache_data(show_spinner=False, max_entries=256, ttl=60 * 60)
+def _greet_html(user_email: str, user_name: str) -> str:
+    display_name = (user_email.split("@")[0] if user_email else "") or (user_name or "User")
+    return f'<div class="greet">Welcome back to PPE Safety Suite, <strong>{html.escape(display_name)}</strong>.</div>'
+
+if _logged_in and "user" in st.session_state:
+    _user = st.session_state["user"]
+    _header.append(_greet_html(_user.get("email", ""), _user.get("name", "")))
+
+st.markdown("".join(_header), unsafe_allow_html=True)
 
 # --- HERO TEXT / CHIPS ---
-st.markdown("""
+_HERO_HTML = """
 <div class="chips">
   <div class="chip">⚡ Real-time Processing</div>
   <div class="chip">☁️ AWS Cloud Integration</div>
@@ -183,32 +128,38 @@ st.markdown("""
     </div>
   </div>
 </section>
-""", unsafe_allow_html=True)
+"""
 
-# --- Slideshow (kept) ---
-slide_imgs = [p for p in SLIDESHOW_IMAGES if p.exists()]
-if slide_imgs:
-    sources = [img_to_data_uri(p) for p in slide_imgs]
-    while len(sources) < 3:
-        sources.append(sources[-1])
-    st.markdown(f"""
+# --- Slideshow (kept; emitted in the same element as the hero text) ---
+if _SLIDESHOW_SRCS:
+    # The crossfade is timed for three slots; with fewer images, slots reuse them by index.
+    # Only the first slide is on screen at load, so it alone gets eager/high-priority fetching.
+    slides = "\n    ".join(
+        picture_html(
+            *_SLIDESHOW_SRCS[i % len(_SLIDESHOW_SRCS)],
+            f'class="fade" style="animation-delay:{3 * i}s" alt="slide {i + 1}" decoding="async" '
+            + ('loading="eager" fetchpriority="high"' if i == 0 else 'loading="lazy"'),
+        )
+        for i in range(3)
+    )
+    st.markdown(f"""{_HERO_HTML}
 <div class="full-bleed">
   <div class="hero-bleed">
-    <img class="fade img1" src="{sources[0]}" alt="slide 1"/>
-    <img class="fade img2" src="{sources[1]}" alt="slide 2"/>
-    <img class="fade img3" src="{sources[2]}" alt="slide 3"/>
+    {slides}
   </div>
 </div>
 """, unsafe_allow_html=True)
 else:
-    st.info("Add images to `images/carousel1.png`, `images/carousel2.png`, `images/carousel3.png` to drive the slideshow.")
+    st.markdown(_HERO_HTML, unsafe_allow_html=True)
+    st.info("Add images to `static/carousel1.png`, `static/carousel2.png`, `static/carousel3.png` to drive the slideshow.")
 
 st.write("")
 
 # --- WHY PPE AUTOMATION MATTERS (professional sentences) ---
-st.markdown("### Why PPE Automation Matters")
 st.markdown(
     """
+### Why PPE Automation Matters
+
 - **Prevent injuries.** Automated checks catch missing PPE before incidents occur.  
 - **Prove compliance.** Every detection is logged with time, image, and outcome to create an auditable record.  
 - **Focus teams.** Alerts surface repeat offenders and rising hotspots so supervisors spend time where it matters.  
@@ -216,70 +167,71 @@ st.markdown(
 )
 
 # --- Updates / Cards (smaller images; single CTA to Detect PPE Upload) ---
-st.markdown("""
-<div class="section-kicker">
-  <span>AI Inspection Updates</span>
-</div>
-""", unsafe_allow_html=True)
-
-# Card 1
-with st.container():
-    col = st.columns([1.1, .9], vertical_alignment="center")
-    with col[0]:
-        st.markdown('<div class="card-date">March 10, 2024</div>', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">Seamless Integration: Rekognition + Lambda + DynamoDB</div>', unsafe_allow_html=True)
-        st.markdown(
-            '<div class="card-text">'
+_CARDS = [
+    {
+        "date": "March 10, 2024",
+        "title": "Seamless Integration: Rekognition + Lambda + DynamoDB",
+        "text": (
             'Uploads to S3 automatically trigger PPE detection, face matching, and violation updates—no manual steps required. '
             'A Lambda function orchestrates the workflow, writing results to DynamoDB and pushing alerts through SNS. '
             'The pipeline is fully serverless, highly resilient, and scales down to zero when idle to minimize cost. '
             'Configuration is driven by environment variables and IaC, so deployments are repeatable and auditable. '
             'Security best practices are followed with least-privilege policies and private buckets by default.'
-            '</div>',
-            unsafe_allow_html=True
-        )
-        # Single primary CTA → Detect PPE Upload
-        st.link_button("Upload Photo Test", "pages/01_Detect_PPE_Upload.py")
-    with col[1]:
-        if CARD_IMG1.exists():
-            st.markdown(f'<div class="card-img-sm"><img src="{img_to_data_uri(CARD_IMG1)}"/></div>', unsafe_allow_html=True)
-
-# Card 2
-with st.container():
-    col = st.columns([1.1, .9], vertical_alignment="center")
-    with col[0]:
-        st.markdown('<div class="card-date">February 28, 2024</div>', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">Real-Time PPE Detection in Tough Conditions</div>', unsafe_allow_html=True)
-        st.markdown(
-            '<div class="card-text">'
+        ),
+        "img": CARD_IMG1,
+    },
+    {
+        "date": "February 28, 2024",
+        "title": "Real-Time PPE Detection in Tough Conditions",
+        "text": (
             'Low light, reflective surfaces, and motion are handled with tuned thresholds and robust pre-processing. '
             'Detections include evidence crops so supervisors can verify issues without downloading full images. '
             'Confidence scores are recorded to support quality reviews and continuous improvement. '
             'Latency is typically under a second from upload to alert in regional deployments. '
             'The system is designed to maintain performance even when image quality varies throughout a shift.'
-            '</div>',
-            unsafe_allow_html=True
-        )
-    with col[1]:
-        if CARD_IMG2.exists():
-            st.markdown(f'<div class="card-img-sm"><img src="{img_to_data_uri(CARD_IMG2)}"/></div>', unsafe_allow_html=True)
-
-# Card 3
-with st.container():
-    col = st.columns([1.1, .9], vertical_alignment="center")
-    with col[0]:
-        st.markdown('<div class="card-date">January 15, 2024</div>', unsafe_allow_html=True)
-        st.markdown('<div class="card-title">Actionable Insights for Supervisors</div>', unsafe_allow_html=True)
-        st.markdown(
-            '<div class="card-text">'
+        ),
+        "img": CARD_IMG2,
+    },
+    {
+        "date": "January 15, 2024",
+        "title": "Actionable Insights for Supervisors",
+        "text": (
             'Aggregations by department, site, and line reveal where risks concentrate so training can be targeted. '
             'Cumulative violation counts highlight repeat offenders and support coaching conversations. '
             'Timestamps and image keys provide an auditable trail for investigations and compliance reporting. '
             'Supervisors can adjust thresholds and escalation rules to match local safety policies. '
             'All data remains within your AWS account to simplify governance and data privacy.'
-            '</div>',
-            unsafe_allow_html=True
-        )
-    with col[1]:
-        if CARD_IMG3.exists():
-            st.markdown(f'<div class="card-img-sm"><img src="{img_to_data_uri(CARD_IMG3)}"/></div>', unsafe_allow_html=True)
+        ),
+        "img": CARD_IMG3,
+    },
+]
+
+_CARD_IMG_ATTRS = 'loading="lazy" decoding="async"'
+
+def _card_html(card: dict) -> str:
+    srcs = _CARD_SRCS.get(str(card["img"]))
+    # Cards are below the fold: let the browser defer fetch/decode until they're scrolled near
+    img = (
+        f'<div class="card-img-sm">{picture_html(*srcs, _CARD_IMG_ATTRS)}</div>'
+        if srcs is not None else "<div></div>"
+    )
+    return (
+        '<div class="card"><div>'
+        f'<div class="card-date">{card["date"]}</div>'
+        f'<div class="card-title">{card["title"]}</div>'
+        f'<div class="card-text">{card["text"]}</div>'
+        f'</div>{img}</div>'
+    )
+
+# The kicker + first card, then the CTA widget, then the remaining cards; layout comes from the .card grid.
+st.markdown(
+    '<div class="section-kicker"><span>AI Inspection Updates</span></div>' + _card_html(_CARDS[0]),
+    unsafe_allow_html=True,
+)
+
+# Single primary CTA → Detect PPE Upload, right under the integration card. st.page_link navigates
+# client-side within this session; a plain <a href> would do a full page load into a new session
+# (empty session_state, so the user would hit the login wall).
+st.page_link("pages/04_Detect_PPE_Upload.py", label="Upload Photo Test", icon="⬆️")
+
+st.markdown("".join(_card_html(c) for c in _CARDS[1:]), unsafe_allow_html=True)
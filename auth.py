@@ -1,8 +1,19 @@
-import requests
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlencode
-from jose import jwt, jwk  # jwk kept for future extension
 import streamlit as st
 
+try:
+    from orjson import loads as _json_loads  # faster JSON decode, if installed
+except Exception:
+    from json import loads as _json_loads
+
+# requests and jose (-> cryptography) are imported lazily: only the login callback needs them,
+# so Home and authenticated reruns never pay for those imports.
+
 # ---- Config from secrets ----
 COGNITO_DOMAIN   = st.secrets["COGNITO_DOMAIN"]        # e.g. https://xxxxx.auth.us-east-2.amazoncognito.com
 COGNITO_CLIENTID = st.secrets["COGNITO_APP_CLIENT_ID"] # App client (no secret)
@@ -10,121 +21,226 @@ COGNITO_POOL_ID  = st.secrets["COGNITO_USER_POOL_ID"]  # e.g. us-east-2_abc123
 REGION           = st.secrets.get("REGION", "us-east-2")
 REDIRECT_URI     = st.secrets["COGNITO_REDIRECT_URI"]  # your Streamlit URL (exact, no trailing slash)
 
+# Derived endpoints/params are fixed per process; build them once here.
+_ISSUER        = f"https://cognito-idp.{REGION}.amazonaws.com/{COGNITO_POOL_ID}"  # ID token `iss` claim
+_JWKS_URL      = f"{_ISSUER}/.well-known/jwks.json"
+_AUTHORIZE_URL = f"{COGNITO_DOMAIN}/oauth2/authorize"
+_TOKEN_URL     = f"{COGNITO_DOMAIN}/oauth2/token"
+_LOGIN_PARAMS  = urlencode({
+    "client_id": COGNITO_CLIENTID,
+    "response_type": "code",
+    "scope": "openid email profile",
+    "redirect_uri": REDIRECT_URI,
+})
+_FORM_HEADERS  = {"Content-Type": "application/x-www-form-urlencoded"}
+
 # ---------------------------
 # Utilities
 # ---------------------------
-def _get_query_params():
-    try:
+# Pick the query-param API once at import: st.query_params maps to str values, while the
+# legacy experimental API maps to lists.
+if hasattr(st, "query_params"):
+    def get_query_params():
         return dict(st.query_params)
-    except Exception:
+
+    def _code_from(qp):
+        return qp.get("code")
+
+    def clear_query_params():
+        st.query_params.from_dict({})
+else:
+    def get_query_params():
         return st.experimental_get_query_params()
 
-def _first(v):
-    if isinstance(v, (list, tuple)):
-        return v[0] if v else None
-    return v
+    def _code_from(qp):
+        return (qp.get("code") or [None])[0]
+
+    def clear_query_params():
+        st.experimental_set_query_params()
 
 # ---------------------------
 # Hosted UI URLs & JWKS
 # ---------------------------
+@lru_cache(maxsize=4)
 def login_url(state="state123"):
-    params = {
-        "client_id": COGNITO_CLIENTID,
-        "response_type": "code",
-        "scope": "openid email profile",
-        "redirect_uri": REDIRECT_URI,
-        "state": state,
-    }
-    return f"{COGNITO_DOMAIN}/oauth2/authorize?{urlencode(params)}"
+    # Inputs are process-wide constants, so the URL is built once per state value.
+    return f"{_AUTHORIZE_URL}?{_LOGIN_PARAMS}&{urlencode({'state': state})}"
+
+@lru_cache(maxsize=1)
+def _session():
+    # One pooled HTTP session for all Cognito calls (keeps TLS connections alive between requests)
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    # Two hosts (hosted-UI domain + cognito-idp); room for several concurrent logins
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+# Cognito signing keys rarely rotate: keep the JWKS in-process and revalidate it when it expires
+# (or sooner on an unknown kid, see validate_id_token). The server's max-age wins when it sends one.
+# Once keys are cached, revalidation happens in the background shortly before expiry; callers keep
+# getting the last-known-good keys meanwhile, and if that refresh fails.
+_JWKS_TTL_S     = 6 * 60 * 60  # used when the response has no Cache-Control max-age
+_JWKS_MIN_TTL_S = 5 * 60       # floor for a server-supplied max-age
+_JWKS_PREWARM_S = 60           # start the background refresh this long before expiry
+_MAX_AGE_RE     = re.compile(r"max-age=(\d+)")
+_jwks_lock  = threading.Lock()
+_jwks_cache = {  # keys: {kid: jose Key}
+    "keys": None, "etag": None, "last_modified": None, "expires": 0.0, "refreshing": False,
+}
+
+def _fetch_jwks(etag, last_modified):
+    """GET the JWKS, conditional on the cached validators when there are any."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return _session().get(_JWKS_URL, headers=headers, timeout=15)
+
+def _store_jwks_locked(r):
+    """Apply a JWKS response to the cache. Caller holds _jwks_lock."""
+    from jose import jwk
+    if r.status_code != 304:  # 304: the cached keys are still current, only the expiry moves
+        r.raise_for_status()
+        # Build the RSA public keys once per fetch, not on every token decode
+        _jwks_cache["keys"] = {k["kid"]: jwk.construct(k, k.get("alg", "RS256")) for k in _json_loads(r.content).get("keys", [])}
+        _jwks_cache["etag"] = r.headers.get("ETag")
+        _jwks_cache["last_modified"] = r.headers.get("Last-Modified")
+    m = _MAX_AGE_RE.search(r.headers.get("Cache-Control", ""))
+    ttl = max(_JWKS_MIN_TTL_S, int(m.group(1))) if m else _JWKS_TTL_S
+    _jwks_cache["expires"] = time.monotonic() + ttl
+
+def _refresh_jwks_in_background():
+    try:
+        with _jwks_lock:
+            etag, last_modified = _jwks_cache["etag"], _jwks_cache["last_modified"]
+        r = _fetch_jwks(etag, last_modified)  # outside the lock: readers keep getting the cached keys
+        with _jwks_lock:
+            _store_jwks_locked(r)
+    except Exception:
+        pass  # keep serving the last-known-good keys; the next lookup past the window retries
+    finally:
+        with _jwks_lock:
+            _jwks_cache["refreshing"] = False
 
-def _jwks():
-    url = f"https://cognito-idp.{REGION}.amazonaws.com/{COGNITO_POOL_ID}/.well-known/jwks.json"
-    return requests.get(url, timeout=15).json()
+def _jwks(force_refresh: bool = False):
+    with _jwks_lock:
+        if force_refresh or _jwks_cache["keys"] is None:
+            # Nothing usable cached (or a kid miss): fetch inline. Holding the lock makes
+            # concurrent cold logins share one fetch instead of each hitting Cognito.
+            _store_jwks_locked(_fetch_jwks(_jwks_cache["etag"], _jwks_cache["last_modified"]))
+        elif time.monotonic() >= _jwks_cache["expires"] - _JWKS_PREWARM_S and not _jwks_cache["refreshing"]:
+            _jwks_cache["refreshing"] = True
+            threading.Thread(target=_refresh_jwks_in_background, name="jwks-refresh", daemon=True).start()
+        return _jwks_cache["keys"]
 
 # ---------------------------
 # Token exchange & validation
 # ---------------------------
 def exchange_code_for_tokens(code: str):
-    token_url = f"{COGNITO_DOMAIN}/oauth2/token"
-    data = {
+    body = urlencode({
         "grant_type": "authorization_code",
         "client_id": COGNITO_CLIENTID,
         "code": code,
         "redirect_uri": REDIRECT_URI,
-    }
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    r = requests.post(token_url, data=data, headers=headers, timeout=15)
+    }).encode("ascii")
+    r = _session().post(_TOKEN_URL, data=body, headers=_FORM_HEADERS, timeout=15)
     r.raise_for_status()
-    return r.json()  # { id_token, access_token, ... }
+    return _json_loads(r.content)  # { id_token, access_token, ... }
 
-def validate_id_token(id_token: str):
-    jwks = _jwks()
+def validate_id_token(id_token: str, keys=None):
+    from jose import jwt
+    from jose.exceptions import JWTError
+    if keys is None:
+        keys = _jwks()
+    kid = jwt.get_unverified_header(id_token).get("kid")
+    key = keys.get(kid)
+    if key is None:
+        # Unknown key id: the pool's keys may have rotated since we cached them
+        key = _jwks(force_refresh=True).get(kid)
+    if key is None:
+        raise JWTError(f"Unknown signing key id: {kid}")
     return jwt.decode(
         id_token,
-        jwks,
+        key,
         algorithms=["RS256"],
         audience=COGNITO_CLIENTID,
-        issuer=f"https://cognito-idp.{REGION}.amazonaws.com/{COGNITO_POOL_ID}",
+        issuer=_ISSUER,
         options={"verify_at_hash": False},
     )
 
+def _exchange_and_validate(code: str):
+    """Exchange the auth code and validate the ID token; returns (tokens, claims).
+
+    The token POST runs on a worker thread while this thread fetches/looks up the JWKS,
+    so a cold login pays max(token, jwks) latency instead of the sum. The executor is per login,
+    so one slow Cognito call never queues other sessions' logins behind it.
+    """
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        fut = ex.submit(exchange_code_for_tokens, code)
+        keys = _jwks()
+        tokens = fut.result()
+    return tokens, validate_id_token(tokens["id_token"], keys)
+
 # ---------------------------
 # Session helpers
 # ---------------------------
+def _token_still_valid() -> bool:
+    # exp comes from the claims validated at login; 60s margin for clock skew
+    return time.time() < st.session_state.get("_id_exp", 0) - 60
+
 def is_logged_in() -> bool:
-    return "id_token" in st.session_state or st.session_state.get("logged_in", False)
+    # No re-verification per page: the signature was checked once at login, only expiry is re-checked.
+    logged_in = "id_token" in st.session_state or st.session_state.get("logged_in", False)
+    return logged_in and _token_still_valid()
+
+def _complete_login(code: str):
+    """Exchange ?code=..., store the session in one update, and clean the URL."""
+    tokens, claims = _exchange_and_validate(code)
+    st.session_state.update({
+        "id_token": tokens["id_token"],
+        "user": {
+            "email": claims.get("email"),
+            "name": claims.get("name") or claims.get("cognito:username"),
+            "sub": claims.get("sub"),
+        },
+        "logged_in": True,
+        "_id_exp": claims.get("exp", 0),
+    })
+    clear_query_params()  # clean URL
 
 # ---------------------------
 # Public API used by pages
 # ---------------------------
 def ensure_logged_in():
     """Blocking: show login button if not logged-in; complete flow if ?code=..."""
-    qp = _get_query_params()
+    if is_logged_in():  # steady state: nothing to read or complete
+        return
+
+    qp = get_query_params()
 
     # complete flow if redirected back
-    if "code" in qp and not is_logged_in():
-        code = _first(qp.get("code"))
-        if code:
-            tokens = exchange_code_for_tokens(code)
-            claims = validate_id_token(tokens["id_token"])
-            st.session_state["id_token"] = tokens["id_token"]
-            st.session_state["user"] = {
-                "email": claims.get("email"),
-                "name": claims.get("name") or claims.get("cognito:username"),
-                "sub": claims.get("sub"),
-            }
-            st.session_state["logged_in"] = True
-            # clean URL
-            try:
-                st.query_params.clear()
-            except Exception:
-                st.experimental_set_query_params()
+    code = _code_from(qp)
+    if code:
+        _complete_login(code)
 
     if not is_logged_in():
         st.link_button("🔐 Log in with Cognito", login_url(), type="primary")
         st.stop()
 
-def complete_login_if_returned():
+def complete_login_if_returned(qp=None):
     """
     Non-blocking: if we came back with ?code=..., finish the login silently and continue.
-    Use this on public pages (e.g., Home).
+    Use this on public pages (e.g., Home). Pass `qp` if the page already read the query params.
     """
-    qp = _get_query_params()
-    code = _first(qp.get("code"))
-    if code and not is_logged_in():
-        tokens = exchange_code_for_tokens(code)
-        claims = validate_id_token(tokens["id_token"])
-        st.session_state["id_token"] = tokens["id_token"]
-        st.session_state["user"] = {
-            "email": claims.get("email"),
-            "name": claims.get("name") or claims.get("cognito:username"),
-            "sub": claims.get("sub"),
-        }
-        st.session_state["logged_in"] = True
-        try:
-            st.query_params.clear()
-        except Exception:
-            st.experimental_set_query_params()
+    if is_logged_in():
+        return
+    if qp is None:
+        qp = get_query_params()
+    code = _code_from(qp)
+    if code:
+        _complete_login(code)
 
 def logout_button():
     if is_logged_in():
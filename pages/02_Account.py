@@ -2,60 +2,15 @@
 import streamlit as st
 from pathlib import Path
 from auth import ensure_logged_in, logout_button
+from utils.assets import load_text
 
 st.set_page_config(page_title="Account • PPE Safety Suite", page_icon="🦺", layout="wide")
 
 # ---- Styles (PPE-themed warm gradient; keeps your structure/logic intact) ----
-st.markdown("""
-<style>
-/* Warm PPE-inspired background (subtle orange) + soft radial glow */
-.stApp {
-  background:
-    radial-gradient(circle at 12% 18%, rgba(255, 127, 39, 0.10) 0%, transparent 40%),
-    linear-gradient(135deg, #fff7ed 0%, #ffedd5 40%, #ffffff 100%);
-}
-footer {visibility: hidden;}
-
-/* Sidebar aligned with theme */
-[data-testid="stSidebar"] {
-  background: linear-gradient(180deg, #fff7ed 0%, #ffffff 100%);
-  border-right: 1px solid #f1f5f9;
-}
-
-/* Top nav + common UI */
-.navbar {display:flex; align-items:center; justify-content:space-between; padding:14px 10px;}
-.nav-left, .nav-right {display:flex; gap:22px; align-items:center;}
-.nav-link {font-weight:600; color:#0f172a; text-decoration:none;}
-.nav-cta {
-  background:#f97316; /* PPE orange */
-  color:white !important;
-  padding:8px 14px; border-radius:10px; font-weight:600; text-decoration:none;
-  box-shadow: 0 4px 10px rgba(249,115,22,.18);
-}
-.nav-cta:hover { background:#ea580c; }
-
-.chips {display:flex; gap:14px; flex-wrap:wrap; margin:10px 0 6px 0;}
-.chip {display:inline-flex; gap:8px; align-items:center; padding:6px 10px; border:1px solid #e5e7eb; border-radius:999px; font-size:13px; background:white;}
-.hero {padding: 10px 0 20px 0;}
-.kicker {letter-spacing:.06em; text-transform:uppercase; font-size:12px; color:#f97316; font-weight:700;}
-.h1 {font-size:36px; line-height:1.2; font-weight:800; color:#0f172a; margin:6px 0;}
-.card {display:grid; grid-template-columns:1fr 1fr; gap:26px; padding:22px; border:1px solid #e5e7eb; border-radius:16px; background:white;}
-.badge {padding:2px 8px; background:#fde68a; border-radius:999px; font-size:11px; color:#92400e;}
-
-/* Profile layout */
-.profile-grid {display:grid; grid-template-columns: 1.1fr .9fr; gap:24px;}
-.profile-box {
-  background:white; border:1px solid #e5e7eb; border-radius:16px; padding:18px;
-  box-shadow: 0 6px 18px rgba(16, 24, 40, 0.04);
-}
-.kv {display:grid; grid-template-columns: 140px 1fr; gap:10px; margin:4px 0;}
-.kv > div:first-child {color:#64748b; font-size:13px;}
-.kv > div:last-child {font-weight:600;}
-</style>
-""", unsafe_allow_html=True)
+ACCOUNT_CSS = Path("static/account.css")
 
 # ---- NAVBAR ----
-st.markdown("""
+_NAVBAR_HTML = """
 <div class="navbar">
   <div class="nav-left">
     <span style="font-weight:800; font-size:16px;">🦺 PPE Safety Suite</span>
@@ -64,10 +19,10 @@ st.markdown("""
     <a class="nav-cta" href="#">Contact us</a>
   </div>
 </div>
-""", unsafe_allow_html=True)
+"""
 
 # ---- HERO ----
-st.markdown("""
+_HERO_HTML = """
 <div class="chips">
   <div class="chip">🔒 AWS Cognito Login</div>
   <div class="chip">🪪 OIDC (Hosted UI)</div>
@@ -78,7 +33,13 @@ st.markdown("""
   <div class="kicker">Secure Access</div>
   <div class="h1">Sign in to PPE Safety Suite</div>
 </section>
-""", unsafe_allow_html=True)
+"""
+
+# Stylesheet, navbar and hero are static: one markdown element per run.
+st.markdown(
+    f"<style>{load_text(ACCOUNT_CSS)}</style>{_NAVBAR_HTML}{_HERO_HTML}",
+    unsafe_allow_html=True,
+)
 
 # ---- LOGIN ----
 # If not logged-in, ensure_logged_in() renders the Cognito button and stops the script.
@@ -8,8 +8,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # NEW: imports for S3 & DynamoDB upload of employee photo + profile
 import uuid
 from datetime import datetime
-import boto3
 import importlib
+from utils.aws import ddb_client, s3_client, scan_all, to_ddb
 
 # --- Robust import of utils.data, with graceful fallbacks and clear errors ---
 _missing = []
@@ -76,39 +76,18 @@ st.markdown("""
 st.title("Employees (Master List)")
 st.caption("Directory of employees (DynamoDB: employee_master) with profile photos. Register new employees below.")
 
-# --- AWS config (reads secrets w/ env fallbacks) ---
-AWS_ACCESS_KEY = st.secrets.get("AWS_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID", ""))
-AWS_SECRET_KEY = st.secrets.get("AWS_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY", ""))
-REGION        = st.secrets.get("REGION", os.getenv("AWS_REGION", "us-east-2"))
-
+# --- AWS config (credentials/region live in utils/aws.py) ---
 S3_BUCKET        = "ppe-detection-input"
 S3_PREFIX        = "employees"             # employees/<employee_id>.<ext>
 EMPLOYEE_TABLE   = "employee_master"       # table that holds employee directory
 
 DISPLAY_COLS = ["Photo", "EmployeeID", "Name", "Department", "Site", "Job title", "Email", "Status", "Created"]
 
-def _s3_client():
-    return boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-
-def _ddb_table(name: str):
-    ddb = boto3.resource(
-        "dynamodb",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-    return ddb.Table(name)
-
 def _presigned_url(key: str, expires=3600) -> str | None:
     if not key:
         return None
     try:
-        s3 = _s3_client()
+        s3 = s3_client()
         return s3.generate_presigned_url(
             "get_object",
             Params={"Bucket": S3_BUCKET, "Key": key},
@@ -119,18 +98,7 @@ def _presigned_url(key: str, expires=3600) -> str | None:
 
 def _scan_employee_master() -> pd.DataFrame:
     """Read employee_master and return normalized DataFrame."""
-    tbl = _ddb_table(EMPLOYEE_TABLE)
-    items = []
-    start_key = None
-    while True:
-        if start_key:
-            resp = tbl.scan(ExclusiveStartKey=start_key)
-        else:
-            resp = tbl.scan()
-        items.extend(resp.get("Items", []))
-        start_key = resp.get("LastEvaluatedKey")
-        if not start_key:
-            break
+    items = scan_all(EMPLOYEE_TABLE)
 
     if not items:
         return pd.DataFrame(columns=DISPLAY_COLS)
@@ -261,7 +229,7 @@ def _put_photo_to_s3(employee_id: str, file, filename: str) -> str:
         ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
         ".png": "image/png", ".webp": "image/webp",
     }.get(ext, "application/octet-stream")
-    s3 = _s3_client()
+    s3 = s3_client()
     file.seek(0)
     s3.put_object(
         Bucket=S3_BUCKET,
@@ -273,7 +241,6 @@ def _put_photo_to_s3(employee_id: str, file, filename: str) -> str:
     return key
 
 def _upsert_employee_profile_to_master(employee_id: str, payload: dict):
-    tbl = _ddb_table(EMPLOYEE_TABLE)
     item = {
         "EmployeeID": employee_id,
         "name": payload.get("name"),
@@ -285,7 +252,7 @@ def _upsert_employee_profile_to_master(employee_id: str, payload: dict):
         "created_at": payload.get("created_at"),
         "status": payload.get("status", "Active"),
     }
-    tbl.put_item(Item=item)
+    ddb_client().put_item(TableName=EMPLOYEE_TABLE, Item=to_ddb(item))
 
 st.subheader("Register New Employee")
 st.caption("Create a new employee profile with ID photo.")
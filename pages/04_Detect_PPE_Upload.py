@@ -1,16 +1,26 @@
 # pages/Detect_PPE_Upload.py
 import streamlit as st
-import boto3
+import io
 import os
+import random
 import time
 import uuid
 import mimetypes
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from boto3.dynamodb.conditions import Attr
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+try:
+    from PIL import Image, ImageOps
+except Exception:
+    Image = None  # no Pillow: photos are uploaded as-is
 
 # ✅ Auth guard
 from auth import require_login
+# Shared AWS clients/config (imported once per process)
+from utils.aws import AWS_ACCESS_KEY, AWS_SECRET_KEY, ddb_client, from_ddb, s3_client, sqs_client, to_ddb
 
 # ------------------------
 # PAGE CONFIG
@@ -19,23 +29,39 @@ st.set_page_config(page_title="Detect PPE (Upload)", page_icon="🦺", layout="w
 require_login()
 
 # ------------------------
-# AWS CONFIG (secrets with env fallbacks)
+# AWS CONFIG (credentials/region live in utils/aws.py)
 # ------------------------
-AWS_ACCESS_KEY = st.secrets.get("AWS_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID", ""))
-AWS_SECRET_KEY = st.secrets.get("AWS_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY", ""))
-REGION         = st.secrets.get("REGION", os.getenv("AWS_REGION", "us-east-2"))
+# Optional: SQS queue (subscribed to the Lambda's completion SNS topic) carrying an `image_key`
+# per processed upload. When set, we wait on the queue instead of polling DynamoDB.
+RESULT_QUEUE_URL = st.secrets.get("RESULT_QUEUE_URL", os.getenv("RESULT_QUEUE_URL", ""))
+FOREIGN_MESSAGE_HIDE_S = 2  # another upload's message is hidden from this session this long before its owner sees it
 
 BUCKET_NAME    = "ppe-detection-input"
 UPLOAD_PREFIX  = "uploads/"
 EMP_TABLE      = "employee_master"
 VIOL_TABLE     = "violation_master"
+VIOL_IMAGE_IDX = "last_image_key-index"  # GSI on violation_master: HASH=last_image_key (projection must include the polled fields)
 
 if not UPLOAD_PREFIX.endswith("/"):
     UPLOAD_PREFIX += "/"
 
+# Uploads above 8 MB go multipart with parallel parts; smaller ones stay a single PUT
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+)
+
+# Large photos are downscaled before upload; detection doesn't need more than ~1280px
+DOWNSCALE_ABOVE_BYTES = 1 * 1024 * 1024
+UPLOAD_MAX_EDGE_PX    = 1280
+UPLOAD_JPEG_QUALITY   = 85
+
 # Poll (how long we wait for Lambda to write the result row)
-POLL_SECONDS  = 25
-POLL_INTERVAL = 2.0
+POLL_SECONDS    = 25
+POLL_INTERVAL   = 2.0  # cap on the delay between polls
+POLL_FIRST_WAIT = 0.2  # first delay; doubles per empty poll up to POLL_INTERVAL (±20% jitter)
 
 # ------------------------
 # CONSTANTS / STYLES
@@ -93,22 +119,6 @@ st.markdown("""
 # ------------------------
 # HELPERS
 # ------------------------
-def s3_client():
-    return boto3.client(
-        "s3",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-
-def ddb_resource():
-    return boto3.resource(
-        "dynamodb",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-
 def unique_key(filename: str) -> str:
     ext = os.path.splitext(filename)[1].lower()
     return f"{UPLOAD_PREFIX}{int(time.time())}-{uuid.uuid4().hex[:8]}{ext}"
@@ -117,58 +127,174 @@ def guess_content_type(filename: str) -> str:
     ctype, _ = mimetypes.guess_type(filename)
     return ctype or "application/octet-stream"
 
+def prepare_upload(image_file, filename: str):
+    """(file object, filename) to upload: photos over DOWNSCALE_ABOVE_BYTES become a
+    <=UPLOAD_MAX_EDGE_PX JPEG (renamed to .jpg); anything smaller, or undecodable, goes as-is."""
+    image_file.seek(0)  # the preview may have read it
+    if Image is None or image_file.size <= DOWNSCALE_ABOVE_BYTES:
+        return image_file, filename
+    try:
+        with Image.open(image_file) as im:
+            im = ImageOps.exif_transpose(im)  # bake in phone orientation; EXIF is dropped on re-encode
+            im.thumbnail((UPLOAD_MAX_EDGE_PX, UPLOAD_MAX_EDGE_PX))
+            buf = io.BytesIO()
+            im.convert("RGB").save(buf, "JPEG", quality=UPLOAD_JPEG_QUALITY, optimize=True)
+    except OSError:
+        image_file.seek(0)
+        return image_file, filename
+    buf.seek(0)
+    return buf, f"{os.path.splitext(filename)[0]}.jpg"
+
+def _message_image_key(msg: dict):
+    """image_key from an SQS message: raw-delivery attribute, JSON body, or the SNS envelope
+    (its MessageAttributes, or the JSON `Message` payload the Lambda published)."""
+    attr = msg.get("MessageAttributes", {}).get("image_key")
+    if attr:
+        return attr.get("StringValue")
+    try:
+        body = json.loads(msg.get("Body") or "{}")
+    except ValueError:
+        return None
+    if not isinstance(body, dict):  # valid JSON but not an object, e.g. a stray "abc" or 123
+        return None
+    if "image_key" in body:
+        return body["image_key"]
+    env_attr = body.get("MessageAttributes", {}).get("image_key", {}).get("Value")
+    if env_attr or not isinstance(body.get("Message"), str):
+        return env_attr
+    try:
+        payload = json.loads(body["Message"])  # e.g. sns.publish(Message=json.dumps({"image_key": k}))
+    except ValueError:
+        return None
+    return payload.get("image_key") if isinstance(payload, dict) else None
+
+def wait_for_result_message(image_key: str, deadline: float) -> bool:
+    """Long-poll RESULT_QUEUE_URL until Lambda announces image_key; False if the deadline passes first."""
+    sqs = sqs_client()
+    while (remaining := deadline - time.time()) > 0:
+        resp = sqs.receive_message(
+            QueueUrl=RESULT_QUEUE_URL,
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=max(1, min(20, int(remaining))),
+            AttributeNames=["SentTimestamp"],
+            MessageAttributeNames=["image_key"],
+        )
+        messages = resp.get("Messages", [])
+        for msg in messages:
+            if _message_image_key(msg) == image_key:
+                sqs.delete_message(QueueUrl=RESULT_QUEUE_URL, ReceiptHandle=msg["ReceiptHandle"])
+                return True
+            sent_ms = msg.get("Attributes", {}).get("SentTimestamp")
+            if sent_ms and time.time() - int(sent_ms) / 1000 > POLL_SECONDS:
+                # Older than any upload still waiting on it (its session gave up or closed): drop it
+                sqs.delete_message(QueueUrl=RESULT_QUEUE_URL, ReceiptHandle=msg["ReceiptHandle"])
+            else:
+                # Another live session's result: hide it from us for a moment instead of receiving it
+                # again on the very next call; its owner gets it once it's visible again.
+                sqs.change_message_visibility(
+                    QueueUrl=RESULT_QUEUE_URL, ReceiptHandle=msg["ReceiptHandle"],
+                    VisibilityTimeout=FOREIGN_MESSAGE_HIDE_S,
+                )
+        if messages:  # only others' messages came back: pause before the next receive
+            time.sleep(max(0.0, min(POLL_FIRST_WAIT, deadline - time.time())))
+    return False
+
 def poll_violation_result(image_key: str):
-    """Poll violation_master for a row whose last_image_key == image_key."""
-    ddb = ddb_resource()
-    table = ddb.Table(VIOL_TABLE)
+    """Poll violation_master for a row whose last_image_key == image_key.
+
+    Uses a Query on the last_image_key GSI (single-partition read); if the index isn't
+    deployed, falls back to the filtered Scan. With RESULT_QUEUE_URL set, waits for Lambda's
+    completion message first, so the table is normally read only once the row should be there;
+    if the message never comes, the table is still checked once before giving up.
+    """
+    ddb = ddb_client()
+    # Only what build_display_result reads; last_image_key is the lookup value itself
+    lookup = {
+        "TableName": VIOL_TABLE,
+        "ProjectionExpression": "#eid, violations, last_missing, last_updated",
+        "ExpressionAttributeNames": {"#eid": "EmployeeID", "#ik": "last_image_key"},
+        "ExpressionAttributeValues": to_ddb({":ik": image_key}),
+    }
+    use_index = True
 
     deadline = time.time() + POLL_SECONDS
-    while time.time() < deadline:
-        resp = table.scan(
-            FilterExpression=Attr("last_image_key").eq(image_key),
-            ProjectionExpression="#eid, violations, last_missing, last_updated, last_image_key",
-            ExpressionAttributeNames={"#eid": "EmployeeID"},
-        )
+    if RESULT_QUEUE_URL:
+        # A lost or late publish must not read as "compliant": on timeout the deadline has passed,
+        # so the loop below still does its one lookup.
+        if wait_for_result_message(image_key, deadline):
+            # Processing is done: give GSI propagation a short window (2*POLL_INTERVAL, ~5 backed-off
+            # lookups at 0/0.2/0.6/1.4/3.0s), then treat "no row" as compliant
+            deadline = min(deadline, time.time() + 2 * POLL_INTERVAL)
+
+    attempt = 0
+    while True:  # at least one lookup, even when the deadline has already passed
+        resp = None
+        if use_index:
+            try:
+                resp = ddb.query(
+                    IndexName=VIOL_IMAGE_IDX,
+                    KeyConditionExpression="#ik = :ik",
+                    Limit=1,
+                    ConsistentRead=False,  # GSIs are eventually consistent; half the RCUs of a strong read
+                    **lookup,
+                )
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "ValidationException":
+                    raise
+                use_index = False  # index missing (or not projecting these fields): scan instead
+        if resp is None:
+            resp = ddb.scan(FilterExpression="#ik = :ik", **lookup)
         items = resp.get("Items", [])
         if items:
-            return items[0]
-        time.sleep(POLL_INTERVAL)
-    return None
-
+            return from_ddb(items[0])
+        # Fast Lambdas are picked up within a fraction of a second; slow ones back off, and the
+        # jitter keeps concurrent uploads from polling the table in lockstep.
+        delay = min(POLL_INTERVAL, POLL_FIRST_WAIT * 2 ** attempt) * random.uniform(0.8, 1.2)
+        attempt += 1
+        if time.time() + delay >= deadline:
+            return None
+        time.sleep(delay)
+
+# employee_master rows rarely change; reruns and repeat uploads by the same person reuse the row
+@st.cache_data(ttl=300, show_spinner=False)
 def get_employee_profile(employee_id: str):
     """Get row from employee_master."""
     if not employee_id or employee_id == "—":
         return {}
-    ddb = ddb_resource()
-    table = ddb.Table(EMP_TABLE)
-    resp = table.get_item(Key={"EmployeeID": employee_id})
-    return resp.get("Item", {})
+    resp = ddb_client().get_item(TableName=EMP_TABLE, Key=to_ddb({"EmployeeID": employee_id}))
+    return from_ddb(resp.get("Item", {}))
 
-def _read_json_from_s3(key: str):
+def _read_json_from_s3(s3, key: str):
     """Try to read a small JSON object from S3; return dict or None."""
     try:
-        s3 = s3_client()
         obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
         data = obj["Body"].read()
         return json.loads(data)
     except Exception:
         return None
 
-def fetch_detection_json(image_key: str):
+def fetch_detection_json(image_key: str, s3):
     """
     Try a couple of common locations for the Lambda-produced JSON:
     1) Same key + .json  (e.g., uploads/abc.png.json)
     2) results/<basename>.json
+    Both locations are probed concurrently, so a result stored at 2) no longer costs a wasted
+    round-trip on 1) first; 1) still wins when both exist.
+    Takes the client as an argument (no Streamlit calls), so it can run on a worker thread.
     """
     base = os.path.basename(image_key)
     cand1 = f"{image_key}.json"
     cand2 = f"results/{os.path.splitext(base)[0]}.json"
 
-    for cand in (cand1, cand2):
-        js = _read_json_from_s3(cand)
-        if js is not None:
-            return js
-    return None
+    ex = ThreadPoolExecutor(max_workers=2)
+    try:
+        for fut in [ex.submit(_read_json_from_s3, s3, cand) for cand in (cand1, cand2)]:
+            js = fut.result()
+            if js is not None:
+                return js
+        return None
+    finally:
+        ex.shutdown(wait=False)  # a hit on 1) doesn't wait for the other probe to finish
 
 def build_display_result(image_key: str):
     """
@@ -176,7 +302,14 @@ def build_display_result(image_key: str):
     Only shows fields that exist in DB; PPE detected / confidence come from JSON if present.
     """
     vio = poll_violation_result(image_key)
-    det_json = fetch_detection_json(image_key)  # Optional
+    employee_id = vio.get("EmployeeID", "—") if vio else "—"
+
+    # The detection JSON (S3) and the profile (DynamoDB) are independent round-trips: fetch the
+    # JSON on a worker thread while this thread does the profile lookup.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        f_json = ex.submit(fetch_detection_json, image_key, s3_client())
+        profile = get_employee_profile(employee_id)
+        det_json = f_json.result()  # Optional
 
     if not vio:
         # Not found — likely compliant or still processing
@@ -193,9 +326,6 @@ def build_display_result(image_key: str):
             "image_key": image_key,
         }
 
-    employee_id = vio.get("EmployeeID", "—")
-    profile = get_employee_profile(employee_id)
-
     # From DB (violation_master)
     last_missing = (vio.get("last_missing") or "").strip()
     violations = [x.strip() for x in last_missing.split(",") if x.strip()]
@@ -240,33 +370,36 @@ with left:
     use_camera = st.toggle("📸 Use camera")
     camera_img = st.camera_input("Take a photo") if use_camera else None
 
-    file_bytes = None
+    # Keep the UploadedFile itself (a BytesIO) rather than a getvalue() copy of its bytes
+    image_file = None
     original_name = None
 
     if camera_img is not None:
-        file_bytes = camera_img.getvalue()
+        image_file = camera_img
         original_name = "camera_capture.png"
     elif uploaded_file is not None:
-        file_bytes = uploaded_file.getvalue()
+        image_file = uploaded_file
         original_name = uploaded_file.name
 
-    if file_bytes:
+    if image_file is not None:
         st.markdown("**Preview**")
-        st.image(file_bytes, caption=None, width=PREVIEW_WIDTH_PX)
+        st.image(image_file, caption=None, width=PREVIEW_WIDTH_PX)
 
         if st.button("⬆️ Upload to S3", type="primary"):
             if not AWS_ACCESS_KEY or not AWS_SECRET_KEY:
                 st.error("❌ AWS credentials not found. Add them in `.streamlit/secrets.toml`.")
             else:
-                key = unique_key(original_name)
                 try:
                     with st.spinner("Uploading…"):
+                        upload_obj, upload_name = prepare_upload(image_file, original_name)
+                        key = unique_key(upload_name)
                         s3 = s3_client()
-                        s3.put_object(
-                            Bucket=BUCKET_NAME,
-                            Key=key,
-                            Body=file_bytes,
-                            ContentType=guess_content_type(original_name),
+                        s3.upload_fileobj(
+                            upload_obj,
+                            BUCKET_NAME,
+                            key,
+                            ExtraArgs={"ContentType": guess_content_type(upload_name)},
+                            Config=TRANSFER_CONFIG,
                         )
                     st.success("✅ Uploaded successfully. Waiting for detection result…")
 
@@ -8,10 +8,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # --- AWS / general imports
 import importlib
-import boto3
 from datetime import datetime, timezone
 from decimal import Decimal
 from botocore.exceptions import ClientError
+from utils.aws import ddb_client, scan_all, to_ddb
 
 # ---------- Robust import of utils.data (kept for compatibility) ----------
 _missing = []
@@ -118,25 +118,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- AWS config ----------
-AWS_ACCESS_KEY = st.secrets.get("AWS_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID", ""))
-AWS_SECRET_KEY = st.secrets.get("AWS_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY", ""))
-REGION         = st.secrets.get("REGION", os.getenv("AWS_REGION", "us-east-2"))
-
 EMPLOYEE_TABLE  = "employee_master"
 VIOLATION_TABLE = "violation_master"
 
 # ---------- AWS helpers ----------
-def ddb_resource():
-    return boto3.resource(
-        "dynamodb",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-
-def ddb_table(name:str):
-    return ddb_resource().Table(name)
-
 def _to_native(v):
     if isinstance(v, Decimal):
         return int(v) if v % 1 == 0 else float(v)
@@ -144,18 +129,7 @@ def _to_native(v):
 
 # ---------- Data loaders: scan violation_master and join employee_master ----------
 def _scan_table_all(tbl_name: str) -> list[dict]:
-    tbl = ddb_table(tbl_name)
-    items, start_key = [], None
-    while True:
-        if start_key:
-            resp = tbl.scan(ExclusiveStartKey=start_key)
-        else:
-            resp = tbl.scan()
-        items.extend(resp.get("Items", []))
-        start_key = resp.get("LastEvaluatedKey")
-        if not start_key:
-            break
-    return items
+    return scan_all(tbl_name)
 
 def _load_violation_df() -> pd.DataFrame:
     vio_items = _scan_table_all(VIOLATION_TABLE)
@@ -186,14 +160,14 @@ def _load_violation_df() -> pd.DataFrame:
     return merged
 
 def _update_violation_count(emp_id: str, new_count: int):
-    tbl = ddb_table(VIOLATION_TABLE)
-    tbl.update_item(
-        Key={"EmployeeID": emp_id},
+    ddb_client().update_item(
+        TableName=VIOLATION_TABLE,
+        Key=to_ddb({"EmployeeID": emp_id}),
         UpdateExpression="SET violations=:v, last_updated=:lu",
-        ExpressionAttributeValues={
+        ExpressionAttributeValues=to_ddb({
             ":v": int(new_count),
             ":lu": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        }
+        })
     )
 
 # =========================
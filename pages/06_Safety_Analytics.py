@@ -1,14 +1,14 @@
 # pages/04_Safety_Analytics.py
-import os
 from datetime import datetime, timezone, timedelta
 
-import boto3
 import pandas as pd
 import streamlit as st
 import altair as alt
 from decimal import Decimal
 from botocore.exceptions import ClientError
 
+from utils.aws import scan_all
+
 # -----------------------
 # Page config
 # -----------------------
@@ -122,29 +122,14 @@ def _theme_chart(chart):
     return chart.properties(width="container", height=320).configure_view(strokeWidth=0)
 
 # -----------------------
-# AWS config (same style as other pages)
+# AWS config (credentials/region live in utils/aws.py)
 # -----------------------
-AWS_ACCESS_KEY = st.secrets.get("AWS_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID", ""))
-AWS_SECRET_KEY = st.secrets.get("AWS_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY", ""))
-REGION         = st.secrets.get("REGION", os.getenv("AWS_REGION", "us-east-2"))
-
 EMPLOYEE_TABLE   = "employee_master"
 VIOLATION_TABLE  = "violation_master"
 
 # -----------------------
 # Helpers
 # -----------------------
-def ddb_resource():
-    return boto3.resource(
-        "dynamodb",
-        aws_access_key_id=AWS_ACCESS_KEY,
-        aws_secret_access_key=AWS_SECRET_KEY,
-        region_name=REGION,
-    )
-
-def ddb_table(name: str):
-    return ddb_resource().Table(name)
-
 def _to_native(v):
     if isinstance(v, Decimal):
         return int(v) if v % 1 == 0 else float(v)
@@ -153,18 +138,7 @@ def _to_native(v):
 def _scan_table_all(tbl_name: str) -> list[dict]:
     """Full table scan with pagination. Fine for small/medium tables."""
     try:
-        tbl = ddb_table(tbl_name)
-        items, start_key = [], None
-        while True:
-            if start_key:
-                resp = tbl.scan(ExclusiveStartKey=start_key)
-            else:
-                resp = tbl.scan()
-            items.extend(resp.get("Items", []))
-            start_key = resp.get("LastEvaluatedKey")
-            if not start_key:
-                break
-        return items
+        return scan_all(tbl_name)
     except ClientError as e:
         st.error(f"Failed to scan {tbl_name}: {e.response.get('Error',{}).get('Message','')}")
         return []
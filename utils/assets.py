@@ -0,0 +1,169 @@
+# --- Static asset helpers shared by the page scripts (Home.py, pages/) ---
+# Imported (not re-executed) by the page script, so the asset scan below runs once
+# per process; encoders/derivatives are additionally memoized with st.cache_data.
+
+import hashlib
+import os
+import tempfile
+from binascii import b2a_base64
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+import streamlit as st
+
+try:
+    from pybase64 import b64encode as _b64encode  # SIMD encoder, if installed
+except Exception:
+    def _b64encode(data: bytes) -> bytes:
+        return b2a_base64(data, newline=False)
+
+try:
+    from PIL import Image
+except Exception:
+    Image = None  # no Pillow: callers fall back to the original file as a data URI
+
+ASSET_DIRS   = ("images", "static")
+DERIVED_DIR  = Path("static/_derived")  # generated at runtime (git-ignored), served under app/static/_derived/
+
+_DERIVED_FORMATS = {
+    "JPEG": ("jpg", {"quality": 82, "optimize": True}),
+    "WEBP": ("webp", {"quality": 82, "method": 6}),
+}
+
+def _scan_assets(*dirs: str) -> dict[str, int]:
+    """One directory read per asset folder -> {path: mtime_ns} for every file present."""
+    present = {}
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.is_file():
+                        present[e.path] = e.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return present
+
+# Assets ship with the app and don't change at runtime; restart to pick up new files.
+_PRESENT = _scan_assets(*ASSET_DIRS)
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60)
+def _cached_data_uri(path_str: str, mtime_ns: int) -> str:
+    """Encode once per (path, mtime_ns); reruns reuse the cached string.
+
+    SVGs are text, so they are URL-encoded instead of base64'd (smaller, and gzip-friendly).
+    """
+    p = Path(path_str)
+    if p.suffix.lower() == ".svg":
+        return f"data:image/svg+xml;utf8,{quote(p.read_text(encoding='utf-8'))}"
+    data = p.read_bytes()
+    b64 = _b64encode(data).decode("ascii")
+    ext = p.suffix.replace(".", "").lower()
+    mime = "jpeg" if ext in ("jpg", "jpeg") else "png"
+    return f"data:image/{mime};base64,{b64}"
+
+def _file_digest(path_str: str) -> str:
+    """Short content hash of a file; used to give generated assets content-addressed names."""
+    return hashlib.sha256(Path(path_str).read_bytes()).hexdigest()[:16]
+
+def _write_derivative(path_str: str, digest: str, fmt: str, max_size: tuple[int, int] | None) -> str | None:
+    """Write a re-encoded (optionally downscaled) copy under DERIVED_DIR unless it already exists; return its path.
+
+    Returns None when Pillow isn't available, the source can't be encoded to `fmt`, or DERIVED_DIR
+    isn't writable (callers then fall back to the original file). Plain function (no Streamlit calls),
+    so it is safe to run from worker threads.
+    """
+    if Image is None:
+        return None
+    p = Path(path_str)
+    ext, save_opts = _DERIVED_FORMATS[fmt]
+    size_tag = f"-{max_size[0]}x{max_size[1]}" if max_size else ""
+    # The name carries the source's content hash: a changed source gets a new URL, an unchanged one is never rewritten.
+    out = DERIVED_DIR / f"{p.stem}-{digest}{size_tag}.{ext}"
+    if not out.exists():
+        tmp = None
+        try:
+            DERIVED_DIR.mkdir(parents=True, exist_ok=True)
+            # A private temp file per writer: concurrent threads/processes encoding the same source never share one
+            tmp = tempfile.NamedTemporaryFile(dir=DERIVED_DIR, suffix=".tmp", delete=False)
+            with tmp, Image.open(p) as im:
+                if max_size:
+                    im.thumbnail(max_size)
+                if fmt == "JPEG":
+                    im = im.convert("RGB")
+                im.save(tmp, fmt, **save_opts)
+            os.replace(tmp.name, out)  # atomic: concurrent sessions never see a half-written file
+        except (OSError, KeyError, ValueError, Image.DecompressionBombError):
+            # e.g. read-only app dir, Pillow built without WebP, or an undecodable/oversized source
+            return None
+        finally:
+            if tmp is not None and os.path.exists(tmp.name):  # failed encode: don't leave the temp file behind
+                os.unlink(tmp.name)
+    return str(out)
+
+@st.cache_data(show_spinner=False)
+def _cached_digest(path_str: str, mtime_ns: int) -> str:
+    return _file_digest(path_str)
+
+@st.cache_data(show_spinner=False)
+def _cached_derivative(path_str: str, mtime_ns: int, fmt: str, max_size: tuple[int, int] | None = None) -> str | None:
+    return _write_derivative(path_str, _cached_digest(path_str, mtime_ns), fmt, max_size)
+
+@st.cache_data(show_spinner=False)
+def _cached_text(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text(encoding="utf-8")
+
+# ---- Public helpers ----
+
+@st.cache_resource(show_spinner=False)
+def prefetch_derivatives(jobs: tuple[tuple[Path, str, tuple[int, int] | None], ...]) -> None:
+    """Encode every (path, fmt, max_size) job concurrently, once per process.
+
+    Pillow releases the GIL while decoding/encoding, so a cold start overlaps the image work instead of
+    doing it one file at a time; the cached lookups afterwards only find the files already on disk.
+    """
+    jobs = [(str(p), fmt, size) for p, fmt, size in jobs if str(p) in _PRESENT]
+    if Image is None or not jobs:
+        return
+    # Hash each source once, here on the script thread, through the same cache the later lookups use
+    digests = {path: _cached_digest(path, _PRESENT[path]) for path, _, _ in jobs}
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        list(ex.map(lambda j: _write_derivative(j[0], digests[j[0]], j[1], j[2]), jobs))
+
+def is_present(p: Path) -> bool:
+    return str(p) in _PRESENT
+
+def static_url(p: Path) -> str:
+    """URL of a file under ./static as served by Streamlit (server.enableStaticServing)."""
+    return f"app/static/{p.relative_to('static').as_posix()}"
+
+def versioned_static_url(p: Path) -> str:
+    """static_url plus a content-hash query string, so browsers refetch only when the file changes."""
+    return f"{static_url(p)}?v={_cached_digest(str(p), _PRESENT[str(p)])}"
+
+def img_to_data_uri(p: Path) -> str:
+    return _cached_data_uri(str(p), _PRESENT[str(p)])
+
+def derived_url(p: Path, fmt: str, max_size: tuple[int, int] | None = None) -> str | None:
+    """URL of a derivative. The file name is already content-addressed; the `?v=` argument is what makes
+    Tornado's StaticFileHandler (Streamlit's static route) send a far-future max-age instead of revalidating."""
+    digest = _cached_digest(str(p), _PRESENT[str(p)])
+    out = _cached_derivative(str(p), _PRESENT[str(p)], fmt, max_size)
+    return f"{static_url(Path(out))}?v={digest}" if out else None
+
+def thumbnail_srcs(p: Path, max_size: tuple[int, int]) -> tuple[str, str | None]:
+    """(fallback src, WebP src): JPEG/WebP thumbnails, or the full image as a data URI without Pillow."""
+    thumb = derived_url(p, "JPEG", max_size)
+    if thumb is None:
+        return img_to_data_uri(p), None
+    return thumb, derived_url(p, "WEBP", max_size)
+
+def picture_html(src: str, webp_src: str | None, attrs: str) -> str:
+    """<img> wrapped in a <picture> offering the WebP variant first; PNG/JPEG stays the fallback."""
+    img = f'<img src="{src}" {attrs}/>'
+    if webp_src is None:
+        return img
+    return f'<picture><source srcset="{webp_src}" type="image/webp">{img}</picture>'
+
+def load_text(p: Path) -> str:
+    return _cached_text(str(p), _PRESENT[str(p)])
@@ -0,0 +1,54 @@
+# --- AWS clients shared by the page scripts (pages/) ---
+# Imported (not re-executed) by the pages, so config is read once per process. Only low-level boto3
+# clients are used: they are thread-safe, so one client (and connection pool) per service is shared by
+# every session. DynamoDB goes through the client too (resources aren't thread-safe); the helpers below
+# do the attribute-value (de)serialization the resource layer used to do.
+
+import os
+
+import boto3
+import streamlit as st
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# ---- Config (secrets with env fallbacks) ----
+AWS_ACCESS_KEY = st.secrets.get("AWS_ACCESS_KEY_ID", os.getenv("AWS_ACCESS_KEY_ID", ""))
+AWS_SECRET_KEY = st.secrets.get("AWS_SECRET_ACCESS_KEY", os.getenv("AWS_SECRET_ACCESS_KEY", ""))
+REGION         = st.secrets.get("REGION", os.getenv("AWS_REGION", "us-east-2"))
+
+def _client(service: str):
+    return boto3.client(
+        service,
+        aws_access_key_id=AWS_ACCESS_KEY,
+        aws_secret_access_key=AWS_SECRET_KEY,
+        region_name=REGION,
+    )
+
+# Built once per process and shared across reruns and sessions
+@st.cache_resource(show_spinner=False)
+def s3_client():
+    return _client("s3")
+
+@st.cache_resource(show_spinner=False)
+def sqs_client():
+    return _client("sqs")
+
+@st.cache_resource(show_spinner=False)
+def ddb_client():
+    return _client("dynamodb")
+
+# ---- DynamoDB attribute values ----
+_serializer   = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+def to_ddb(values: dict) -> dict:
+    """Plain values -> DynamoDB attribute values (for Key, Item, ExpressionAttributeValues)."""
+    return {k: _serializer.serialize(v) for k, v in values.items()}
+
+def from_ddb(item: dict) -> dict:
+    """DynamoDB attribute values -> plain values (numbers come back as Decimal)."""
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+def scan_all(table: str, **kwargs) -> list[dict]:
+    """Every item of `table` (paginated Scan), deserialized."""
+    pages = ddb_client().get_paginator("scan").paginate(TableName=table, **kwargs)
+    return [from_ddb(it) for page in pages for it in page.get("Items", [])]